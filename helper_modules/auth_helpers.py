@@ -1,25 +1,36 @@
 import re
 import hashlib
-import re
 import json
 import hmac
 import os
 import base64
 import secrets
+import orjson
 from datetime import datetime, timedelta, timezone
 
 # Get the password secret from environment variable, or generate to hash password
 PASSWORD_SECRET = os.environ.get("PASSWORD_SECRET", secrets.token_urlsafe(64))
 
+# HMAC keyed with the password secret; hash_password copies it instead of re-deriving the key state on every call
+_PASSWORD_HMAC = hmac.new(PASSWORD_SECRET.encode('utf-8'), digestmod=hashlib.sha256)
+
 # Set expiration date JWT_token
 DAYS_EXPIRE = 1
 
+# Patterns used to validate passwords and usernames, compiled once at import time
+_LOWERCASE_RE = re.compile('[a-z]')
+_UPPERCASE_RE = re.compile('[A-Z]')
+_DIGIT_RE = re.compile('[0-9]')
+_USERNAME_RE = re.compile(r'\w+')
+
 def generate_jwt_token(username, role, secret_key):
 
     """
     
     Generates a JWT token for a user with the given username and role, using the provided secret key.
 
+    The header is constant and pre-encoded at import, so only the payload is serialized (with orjson) and signed per call.
+
     The `payload` dictionary includes a `datetime` object with an expiration time for the token that is one day in the future. 
     The `timezone` module is used to create a `timezone.utc` object that represents the (UTC) timezone, and the `timedelta` function is used to add one day to the current time to generate the expiration time for the token. 
     This ensures that the token expires after a certain amount of time, providing an additional layer of security to the authentication process.
@@ -38,7 +49,8 @@ def generate_jwt_token(username, role, secret_key):
         'role': role,
         'exp': int((datetime.now(timezone.utc) + timedelta(days=DAYS_EXPIRE)).timestamp()) # JWT_token expires X day from creation
     }
-    return jwt_encode({"alg": "HS256", "typ": "JWT"}, payload, secret_key) # return JWT_token
+    message = _JWT_HEADER_B64 + b'.' + base64url_encode(orjson.dumps(payload))
+    return _sign_jwt(message, secret_key) # return JWT_token
 
 def hash_password(password):
 
@@ -52,7 +64,9 @@ def hash_password(password):
         str: The hashed password in hexadecimal format.
     """
 
-    return hmac.new(PASSWORD_SECRET.encode('utf-8'), password.encode('utf-8'), hashlib.sha256).hexdigest()
+    password_hmac = _PASSWORD_HMAC.copy()
+    password_hmac.update(password.encode('utf-8'))
+    return password_hmac.hexdigest()
 
 def is_password_strong(password):
 
@@ -69,13 +83,13 @@ def is_password_strong(password):
     if len(password) < 8:
         return False
 
-    if not re.search('[a-z]', password):
+    if not _LOWERCASE_RE.search(password):
         return False
 
-    if not re.search('[A-Z]', password):
+    if not _UPPERCASE_RE.search(password):
         return False
 
-    if not re.search('[0-9]', password):
+    if not _DIGIT_RE.search(password):
         return False
 
     return True
@@ -97,7 +111,7 @@ def is_username_valid(username):
         return False
     
     # Only alphanumeric characters and underscores
-    if not re.match(r'^[\w_]+$', username):
+    if not _USERNAME_RE.fullmatch(username):
         return False
 
     return True
@@ -116,6 +130,9 @@ def base64url_encode(self):
 
     return base64.urlsafe_b64encode(self).rstrip(b'=')
 
+# Header of every JWT token created by generate_jwt_token, encoded once using URL-safe Base64 encoding
+_JWT_HEADER_B64 = base64url_encode(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+
 def jwt_encode(self, payload, secret, algorithm='HS256'):
 
     """
@@ -138,16 +155,31 @@ def jwt_encode(self, payload, secret, algorithm='HS256'):
     encoded_payload = base64url_encode(json.dumps(payload).encode('utf-8'))
 
     # Concatenate the encoded header and payload with a period separator
-    message = f'{encoded_header.decode("utf-8")}.{encoded_payload.decode("utf-8")}'
+    message = encoded_header + b'.' + encoded_payload
+
+    # Return the encoded and signed JWT
+    return _sign_jwt(message, secret)
+
+def _sign_jwt(message, secret):
+
+    """
+    Signs the encoded JWT header and payload and appends the signature.
+
+    Args:
+        message (bytes): The encoded header and payload separated by a period.
+        secret (str): The secret used to sign the JWT.
+
+    Returns:
+        str: The encoded and signed JWT.
+    """
 
     # Create the signature using the secret and the HMAC-SHA256 algorithm
-    signature = hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest()
+    signature = hmac.new(secret.encode('utf-8'), message, hashlib.sha256).digest()
 
     # Encode the signature using URL-safe Base64 encoding
     encoded_signature = base64url_encode(signature)
 
-    # Return the encoded and signed JWT
-    return f'{message}.{encoded_signature.decode("utf-8")}'
+    return (message + b'.' + encoded_signature).decode('utf-8')
     
 def base64url_decode(self):
 
@@ -1,7 +1,8 @@
-import re
 import string
-import random
-import re
+import secrets
+import itertools
+from functools import lru_cache
+from datetime import datetime
 
 # Set the max URL length
 INTERNET_MAX_PATH_LENGTH = 2048
@@ -12,37 +13,180 @@ URI_LENGTH = 8
 # Set the range of max_attempts to create a unique ID
 MAX_ATTEMPTS = 100
 
+# Set the number of recently validated URLs whose result is cached
+URL_CACHE_SIZE = 1024
+
+# Set the format used to display creation timestamps
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Set the characters a unique ID is composed of
+_ID_CHARS = string.ascii_letters + string.digits
+
+# Number of distinct unique IDs of URI_LENGTH characters
+_ID_SPACE = len(_ID_CHARS) ** URI_LENGTH
+
+# Number of counter bits that always fit into a URI_LENGTH-character ID
+_ID_BITS = _ID_SPACE.bit_length() - 1
+
+# Random odd multiplier and XOR mask, drawn per process, that scramble the counter so consecutive IDs look unrelated
+_ID_MULTIPLIER = secrets.randbits(_ID_BITS) | 1
+_ID_MASK = secrets.randbits(_ID_BITS)
+
+# Monotonic counter from which unique IDs are derived
+_id_counter = itertools.count()
+
+# Set the URL schemes that are accepted
+_SCHEMES = frozenset({'http', 'https'})
+_SCHEME_PREFIXES = ('http://', 'https://')
+
+# Characters that terminate the host part of a URL
+_HOST_TERMINATORS = ':/?'
+
+def _is_ipv4(host):
+
+    """
+    Check if the given host is a dotted IPv4 address with four octets in the range 0-255.
+    Args:
+        host (str): The host to check.
+    Returns:
+        bool: True if the host is an IPv4 address, False otherwise.
+    """
+
+    octets = host.split('.')
+    if len(octets) != 4:
+        return False
+
+    for octet in octets:
+        if not 1 <= len(octet) <= 3 or not octet.isascii() or not octet.isdigit() or int(octet) > 255:
+            return False
+
+    return True
+
+def _is_domain(host):
+
+    """
+    Check if the given host is a domain name consisting out of one or more labels followed by a 2-6 letter top-level domain.
+    Args:
+        host (str): The host to check.
+    Returns:
+        bool: True if the host is a domain name, False otherwise.
+    """
+
+    # Allow a single trailing dot (fully qualified domain name)
+    if host.endswith('.'):
+        host = host[:-1]
+
+    labels = host.split('.')
+    if len(labels) < 2:
+        return False
+
+    tld = labels.pop()
+    if not 2 <= len(tld) <= 6 or not tld.isascii() or not tld.isalpha():
+        return False
+
+    # Labels consist out of ASCII letters, digits and inner hyphens
+    for label in labels:
+        if not 1 <= len(label) <= 63 or label[0] == '-' or label[-1] == '-':
+            return False
+        if not label.isascii() or not label.replace('-', '').isalnum():
+            return False
+
+    return True
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _parse_url(url):
+
+    """
+    Validate the structure of the given URL: scheme, host (domain, localhost or IPv4), optional port and optional path.
+    Character scans are delegated to str methods (find, isalnum, lstrip, ...) so they run in C instead of a Python loop.
+    Results are cached, so resubmitting a recently validated URL costs a single dictionary lookup.
+    Args:
+        url (str): The URL to validate.
+    Returns:
+        bool: True if the URL is well-formed, False otherwise.
+    """
+
+    # Scheme: http:// or https://
+    scheme, separator, rest = url.partition('://')
+    if not separator or scheme.lower() not in _SCHEMES:
+        return False
+
+    # Host: everything up to the port, path or query
+    end = len(rest)
+    for terminator in _HOST_TERMINATORS:
+        index = rest.find(terminator, 0, end)
+        if index != -1:
+            end = index
+    host, tail = rest[:end], rest[end:]
+
+    if not _is_domain(host):
+        # localhost and IP addresses may be prefixed with www.
+        if host[:4].lower() == 'www.':
+            host = host[4:]
+        if host.lower() != 'localhost' and not _is_ipv4(host):
+            return False
+
+    # Optional port: a colon followed by at least one digit
+    if tail[:1] == ':':
+        path = tail[1:].lstrip(string.digits)
+        if len(path) == len(tail) - 1:
+            return False
+        tail = path
+
+    # Optional path after domain name, without any whitespace
+    if tail in ('', '/'):
+        return True
+    if tail[0] not in '/?' or len(tail) == 1:
+        return False
+    return not any(map(str.isspace, tail))
+
 def is_valid_url(url):
 
     """
-    Validate the given URL using a regular expression and check for URL length and special characters.
+    Validate the given URL using a hand-written scanner and check for URL length and special characters.
     Args:
         url (str): The URL to validate.
     Returns:
         bool: True if the URL is valid, False otherwise.
     """
 
+    # Reject anything that is not an http(s) URL string before scanning or caching it
+    if not isinstance(url, str) or not url[:8].lower().startswith(_SCHEME_PREFIXES):
+        return False
+
     # Check for URL length
     if len(url) > INTERNET_MAX_PATH_LENGTH:
         return False
 
-    regex = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:www\.)?'  # www.
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-        r'localhost|'  # localhost
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or IP
-        r'(?::\d+)?'  # optional port (number that follows the domain name or IP address and)
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE) # optional path after domain name
-
     # Check for special characters not allowed in URLs
-    return False if re.search(r'[<>]', url) else bool(re.match(regex, url))
+    if '<' in url or '>' in url:
+        return False
+
+    return _parse_url(url)
+
+def _encode_id(value):
+
+    """
+    Encode a non-negative integer below _ID_SPACE as a fixed-length identifier over _ID_CHARS.
+    Args:
+        value (int): The integer to encode.
+    Returns:
+        str: A URI_LENGTH-character identifier.
+    """
+
+    chars = []
+    for _ in range(URI_LENGTH):
+        value, index = divmod(value, len(_ID_CHARS))
+        chars.append(_ID_CHARS[index])
+    return ''.join(chars)
 
 def generate_unique_id(url_data, max_attempts=MAX_ATTEMPTS):
 
     """
     Generate a unique identifier using a combination of ASCII letters and digits. 
-    Raise an error if the max_attempts is reached.
+    The identifier is derived from a monotonic counter passed through a per-process bijection on _ID_BITS bits,
+    so IDs generated by the same process never collide. The collision check only guards against IDs loaded from
+    an earlier run, which used a different bijection. Raise an error if the max_attempts is reached.
     Args:
         length (int): The length of the unique identifier.
     Returns:
@@ -50,10 +194,37 @@ def generate_unique_id(url_data, max_attempts=MAX_ATTEMPTS):
     """
 
     attempts = 0
-    chars = string.ascii_letters + string.digits
     while attempts < max_attempts:
-        unique_id = ''.join(random.choices(chars, k=URI_LENGTH))
+        value = next(_id_counter) * _ID_MULTIPLIER & ((1 << _ID_BITS) - 1)
+        unique_id = _encode_id(value ^ _ID_MASK)
         if unique_id not in url_data: # check for collision 
             return unique_id
         attempts += 1
     raise ValueError("Exceeded maximum number of attempts to generate a unique ID.")
+
+def format_timestamp(timestamp):
+
+    """
+    Format a creation timestamp, stored as nanoseconds since the epoch, for display.
+    Args:
+        timestamp (int): The timestamp in nanoseconds since the epoch.
+    Returns:
+        str: The timestamp formatted according to TIMESTAMP_FORMAT in local time.
+    """
+
+    return datetime.fromtimestamp(timestamp / 1e9).strftime(TIMESTAMP_FORMAT)
+
+def parse_timestamp(timestamp):
+
+    """
+    Convert a stored creation timestamp to nanoseconds since the epoch.
+    Data files written before timestamps were stored as integers hold strings formatted according to TIMESTAMP_FORMAT in local time.
+    Args:
+        timestamp (int or str): The stored timestamp.
+    Returns:
+        int: The timestamp in nanoseconds since the epoch.
+    """
+
+    if isinstance(timestamp, str):
+        return int(datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()) * 1_000_000_000
+    return timestamp
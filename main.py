@@ -14,11 +14,11 @@ def main():
     if service_name == "url_shortener":
         auth_service = AuthService(None)
         url_shortener_service = URLShortenerService(auth_service)
-        url_shortener_service.run(debug=True, port=url_port, use_reloader=False)
+        url_shortener_service.run(port=url_port)
     elif service_name == "auth_service":
         url_shortener_service = URLShortenerService(None)
         auth_service = AuthService(url_shortener_service)
-        auth_service.run(debug=True, port=auth_port, use_reloader=False)
+        auth_service.run(port=auth_port)
     else:
         print("Invalid service name. Use 'url_shortener' or 'auth_service'.")
 
@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify
 import secrets
 import os
+import hmac
 from functools import wraps
 from helper_modules.auth_helpers import hash_password, is_password_strong, is_username_valid, jwt_decode, generate_jwt_token
 
@@ -10,6 +11,9 @@ JWT_SECRET = os.environ.get("JWT_SECRET", secrets.token_urlsafe(64))
 # User Database
 USER_DATA = {}
 
+# Set the roles a user can be created with
+_VALID_ROLES = frozenset({'admin', 'regular'})
+
 class AuthService:
 
     """
@@ -63,7 +67,7 @@ class AuthService:
             if auth_header is None:
                 return jsonify({'error': 'Missing Authorization header'}), 401
 
-            token = auth_header.split(' ')[-1]
+            token = auth_header.rpartition(' ')[2]
             decoded_payload = self.validate_jwt(token)
             if decoded_payload is None:
                 return jsonify({'error': 'Invalid JWT token'}), 401
@@ -84,11 +88,7 @@ class AuthService:
             Dict or None: The decoded JWT payload if the token is valid, None otherwise.
         """
 
-        payload = jwt_decode(token, JWT_SECRET)
-        if payload is None:
-            return None
-        else:
-            return payload
+        return jwt_decode(token, JWT_SECRET)
 
     def create_user(self):
 
@@ -124,7 +124,7 @@ class AuthService:
         if role is None or role.strip() == '':
             return jsonify({'error': 'Role is required'}), 400
 
-        if role not in ['admin', 'regular']:
+        if role not in _VALID_ROLES:
             return jsonify({'error': 'Invalid role'}), 400
 
         if username in USER_DATA:
@@ -161,17 +161,18 @@ class AuthService:
         if password is None:
             return jsonify({'error': 'Password is required'}), 400
 
-        if username not in USER_DATA:
+        user = USER_DATA.get(username)
+        if user is None:
             return jsonify({'error': 'User not found'}), 403
 
-        stored_password = USER_DATA[username]['password']
+        stored_password = user['password']
         provided_hash_password = hash_password(password)
 
-        if stored_password != provided_hash_password:
+        if not hmac.compare_digest(stored_password, provided_hash_password): # constant-time comparison
             return jsonify({'error': 'Invalid credentials'}), 403
 
         # Generate JWT token
-        token = generate_jwt_token(username, USER_DATA[username]['role'], JWT_SECRET)
+        token = generate_jwt_token(username, user['role'], JWT_SECRET)
 
         return jsonify({'access_token': token}), 200
         
@@ -206,10 +207,13 @@ class AuthService:
         if not is_password_strong(new_password):
             return jsonify({'error': 'Password must be at least 8 characters long, contain an uppercase letter, a lowercase letter, and a digit'}), 400
 
-        if username not in USER_DATA or USER_DATA[username]['password'] != hash_password(old_password):
+        old_hash_password = hash_password(old_password)
+
+        user = USER_DATA.get(username)
+        if user is None or not hmac.compare_digest(user['password'], old_hash_password):
             return jsonify({'error': 'Invalid credentials'}), 403
 
-        USER_DATA[username]['password'] = hash_password(new_password)
+        user['password'] = hash_password(new_password)
 
         return '', 200
         
@@ -218,10 +222,13 @@ class AuthService:
         """
         Runs the Flask application.
         The host parameter is set to '0.0.0.0' to make the application accessible to any address.
+        Debug mode is only enabled when the FLASK_DEBUG environment variable is set to '1', and the reloader is disabled by default.
 
         Args:
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
 
+        kwargs.setdefault('debug', os.environ.get('FLASK_DEBUG', '0') == '1')
+        kwargs.setdefault('use_reloader', False)
         self.app.run(host='0.0.0.0', *args, **kwargs)
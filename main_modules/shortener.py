@@ -1,35 +1,79 @@
-from flask import Flask, request, jsonify, redirect
+from flask import Flask, Response, request, redirect
+from werkzeug.routing import BaseConverter
+import orjson
 import os
 import json
+import time
+import threading
+from array import array
 from functools import wraps
-from datetime import datetime
-from helper_modules.shortener_helpers import is_valid_url, generate_unique_id
+from helper_modules.shortener_helpers import is_valid_url, generate_unique_id, format_timestamp, parse_timestamp, URI_LENGTH
 
 # Get the base URL from an environment variable, or use default value
 BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
 
+# Get the path of the file the URLs are persisted to from an environment variable, or use default value
+DATA_FILE = os.environ.get("DATA_FILE", "url_data/url_data.json")
+
+# Prefix of every short URL, computed once instead of formatting BASE_URL per request
+_BASE_SLASH = BASE_URL.rstrip('/') + '/'
+
+def _json(obj, status=200):
+
+    """
+    Build a JSON response using orjson, which serializes considerably faster than Flask's jsonify.
+    Args:
+        obj: The JSON-serializable object to send.
+        status (int): The HTTP status code.
+    Returns:
+        Response: A response with an application/json body.
+    """
+
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+class IdConverter(BaseConverter):
+
+    """
+    A route converter that only matches well-formed unique IDs (URI_LENGTH ASCII letters and digits),
+    so malformed IDs are rejected by the router before a view is dispatched.
+    """
+
+    regex = rf'[A-Za-z0-9]{{{URI_LENGTH}}}'
+
 class URLShortenerService:
 
     """
     A URL shortening service implemented using the Flask framework.
 
     Attributes:
-        url_data (dict): A dictionary storing unique IDs and their corresponding URLs.
+        ids (list): The unique IDs of all stored URLs, in order of creation.
+        urls (list): The original URLs, parallel to ids. Deleted entries are marked with None until the lists are compacted.
+        created (array): The creation timestamps in nanoseconds since the epoch as a contiguous int64 array, parallel to ids.
+        id_to_idx (dict): An index mapping each live unique ID to its position in the lists.
+        url_to_idx (dict): A reverse index mapping each live URL to its position in the lists.
+        shared_urls (set): URLs stored under more than one ID, which data files written before updates were checked for duplicates can contain.
         app (Flask): A Flask application instance.
+        _lock (Lock): Serializes access to the lists and indices, as the Flask server handles requests in concurrent threads.
         auth_service (AuthService): An instance of the AuthService class that provides authentication services.
     """
 
-    def __init__(self, auth_service):
+    def __init__(self, auth_service, data_file=DATA_FILE):
 
         """
         Initialize the URLShortenerApp instance and set up the routes.
+        Args:
+            auth_service (AuthService): The service used to validate JWT tokens.
+            data_file (str): The path of the JSON file the URLs are persisted to.
         """
 
         self.auth_service = auth_service
-        self.data_file = 'url_data/url_data.json'
-        self.url_data = self._load_data()
+        self.data_file = data_file
+        self._lock = threading.Lock()
+        self._load_data()
         self.app = Flask(__name__)
         self.app.before_request(self.check_jwt) # add the check_jwt method to be called before each request
+        self.app.register_error_handler(404, self.not_found) # keep the JSON error format for unmatched routes
+        self.app.register_error_handler(405, self.method_not_allowed)
         self.setup_routes()
 
     def setup_routes(self):
@@ -38,25 +82,70 @@ class URLShortenerService:
         Set up the route handlers for the Flask application.
         """
 
-        self.app.add_url_rule('/<string:id>', 'redirect_url', self.redirect_url, methods=['GET'])
+        self.app.url_map.converters['sid'] = IdConverter
+        self.app.add_url_rule('/<sid:id>', 'redirect_url', self.redirect_url, methods=['GET'])
         self.app.add_url_rule('/', 'serve_index', self.serve_index, methods=['GET'])
-        self.app.add_url_rule('/<string:id>', 'update_url', self.update_url, methods=['PUT'])
-        self.app.add_url_rule('/<string:id>', 'delete_url', self.delete_url, methods=['DELETE'])
+        self.app.add_url_rule('/<sid:id>', 'update_url', self.update_url, methods=['PUT'])
+        self.app.add_url_rule('/<sid:id>', 'delete_url', self.delete_url, methods=['DELETE'])
         self.app.add_url_rule('/keys', 'get_all_keys', self.get_all_keys, methods=['GET'])
         self.app.add_url_rule('/', 'create_short_url', self.create_short_url, methods=['POST'])
         self.app.add_url_rule('/', 'unsupported_delete', self.unsupported_delete, methods=['DELETE'])
         self.app.add_url_rule('/search/<string:uri>', 'search_uri', self.search_uri, methods=['GET'])
 
+    def _reset_data(self):
+        self.ids = []
+        self.urls = []
+        self.created = array('q')
+        self.id_to_idx = {}
+        self.url_to_idx = {}
+        self.shared_urls = set()
+
+    def _append(self, id, url, created_at):
+        ids = self.ids
+        index = len(ids)
+        ids.append(id)
+        self.urls.append(url)
+        self.created.append(created_at)
+        self.id_to_idx[id] = index
+        if url in self.url_to_idx:
+            self.shared_urls.add(url)
+        self.url_to_idx[url] = index
+
+    def _unindex_url(self, url, index):
+        # Remove url from the reverse index if it points at index, re-pointing it to a surviving entry that shares the URL
+        url_to_idx = self.url_to_idx
+        if url_to_idx.get(url) != index:
+            return
+        if url in self.shared_urls:
+            survivors = [i for i, other in enumerate(self.urls) if other == url and i != index]
+            if len(survivors) < 2:
+                self.shared_urls.discard(url)
+            if survivors:
+                url_to_idx[url] = survivors[-1]
+                return
+        del url_to_idx[url]
+
+    def _entries(self):
+        # Yield (id, url, created_at) for every live entry, oldest first
+        return ((id, url, created_at) for id, url, created_at in zip(self.ids, self.urls, self.created) if url is not None)
+
+    def _compact(self):
+        # Drop the tombstones left behind by delete_url and rebuild both indices
+        entries = list(self._entries())
+        self._reset_data()
+        for id, url, created_at in entries:
+            self._append(id, url, created_at)
+
     def _load_data(self):
+        self._reset_data()
         if os.path.exists(self.data_file):
             with open(self.data_file, "r") as file:
-                return json.load(file)
-        else:
-            return {}
+                for id, value in json.load(file).items():
+                    self._append(id, value['url'], parse_timestamp(value['created_at'])) # older files hold formatted strings
         
     def _save_data(self):
         with open(self.data_file, "w") as file:
-            json.dump(self.url_data, file)
+            json.dump({id: {"url": url, "created_at": created_at} for id, url, created_at in self._entries()}, file)
 
     def admin_required(f):
 
@@ -74,10 +163,10 @@ class URLShortenerService:
         @wraps(f)
         def decorated_function(self, *args, **kwargs):
             auth_header = request.headers.get('Authorization')
-            token = auth_header.split(' ')[-1]
+            token = auth_header.rpartition(' ')[2]
             payload = self.auth_service.validate_jwt(token)
             if payload.get("role") != "admin":
-                return jsonify({'error': 'Admin privileges required'}), 403
+                return _json({'error': 'Admin privileges required'}, 403)
             return f(self, *args, **kwargs)
         return decorated_function
 
@@ -94,12 +183,38 @@ class URLShortenerService:
 
         auth_header = request.headers.get('Authorization')
         if not auth_header:
-            return jsonify({'error': 'Missing Authorization header'}), 401
+            return _json({'error': 'Missing Authorization header'}, 401)
 
-        token = auth_header.split(' ')[-1]
+        token = auth_header.rpartition(' ')[2]
         payload = self.auth_service.validate_jwt(token)
         if not payload:
-            return jsonify({'error': 'Invalid or expired token'}), 401
+            return _json({'error': 'Invalid or expired token'}, 401)
+
+    def not_found(self, error):
+
+        """
+        Handle requests that match no route, such as malformed IDs rejected by the IdConverter.
+        Args:
+            error (NotFound): The exception raised by the router.
+        Returns:
+            response (json): A JSON response containing an error message.
+        """
+
+        return _json({'error': 'Not Found'}, 404)
+
+    def method_not_allowed(self, error):
+
+        """
+        Handle requests whose path matches a route that does not accept the method, such as PUT or DELETE on /keys.
+        Args:
+            error (MethodNotAllowed): The exception raised by the router.
+        Returns:
+            response (json): A JSON response containing an error message, with the methods the route accepts in the Allow header.
+        """
+
+        response = _json({'error': 'Method not allowed'}, 405)
+        response.headers['Allow'] = ', '.join(error.valid_methods)
+        return response
 
     def redirect_url(self, id):
 
@@ -112,37 +227,51 @@ class URLShortenerService:
                                  a JSON response with an error message otherwise.
         """
 
-        if id in self.url_data:
-            return redirect(self.url_data[id]['url']), 301
+        with self._lock:
+            index = self.id_to_idx.get(id)
+            url = self.urls[index] if index is not None else None
+        if url is not None:
+            return redirect(url), 301
         else:
-            return jsonify({"error": "URL not found"}), 404
+            return _json({"error": "URL not found"}, 404)
 
     @admin_required
     def serve_index(self):
 
         """
-        Retrieve all stored URLs and their corresponding data from the url_data dictionary and generates a list of dictionaries. 
-        Sort the list of dictionaries by the timestamp of creation in descending order.
+        Retrieve all stored URLs and their corresponding data from the parallel lists and stream them as a JSON list of objects. 
+        The list is ordered by the timestamp of creation in descending order. Entries are only ever appended to the lists,
+        so walking them in reverse yields this ordering without sorting.
+        Each entry is serialized as it is sent, so no intermediate list of dictionaries is built for large stores.
         Returns:
-            response (json): A JSON response containing the sorted list of URLs
+            response (json): A streamed JSON response containing the sorted list of URLs
         """
 
-        short_urls = [{
-            "generated_uri": key,
-            "url": f"{BASE_URL}/{key}",
-            "created_at": self.url_data[key]["created_at"],
-            "original_url": self.url_data[key]["url"]
-            }
-            for key in self.url_data
-        ]
-        short_urls = sorted(short_urls, key=lambda x: x['created_at'], reverse=True)
-        
-        return jsonify(short_urls), 200
+        # Bind the iterators under the lock: _compact rebinds the lists rather than rewriting them in place,
+        # so the rows can be streamed after the lock is released
+        with self._lock:
+            rows = zip(reversed(self.ids), reversed(self.urls), reversed(self.created))
+
+        def generate_rows():
+            separator = b'['
+            for key, url, created_at in rows:
+                if url is None:
+                    continue
+                yield separator + orjson.dumps({
+                    "generated_uri": key,
+                    "url": _BASE_SLASH + key,
+                    "created_at": format_timestamp(created_at),
+                    "original_url": url
+                })
+                separator = b','
+            yield b']' if separator == b',' else b'[]'
+
+        return Response(generate_rows(), status=200, mimetype='application/json')
     
     def search_uri(self, uri):
 
         """
-        Search for the given URI in the url_data dictionary.
+        Search for the given URI in the stored URLs.
         Args:
             uri (str): The URI to search for.
         Returns:
@@ -150,19 +279,24 @@ class URLShortenerService:
                              an error message otherwise.
         """
 
-        if uri in self.url_data:
-            original_url = self.url_data[uri]['url']
-            shortened_url = f"{BASE_URL}/{uri}"
-            timestamp = self.url_data[uri]['created_at']
-            return jsonify({'original_url': original_url, 'shortened_url': shortened_url, 'timestamp': timestamp}), 200
+        with self._lock:
+            index = self.id_to_idx.get(uri)
+            if index is not None:
+                original_url = self.urls[index]
+                created_at = self.created[index]
+        if index is not None:
+            shortened_url = _BASE_SLASH + uri
+            timestamp = format_timestamp(created_at)
+            return _json({'original_url': original_url, 'shortened_url': shortened_url, 'timestamp': timestamp}, 200)
         else:
-            return jsonify({'error': 'URI not found'}), 404
+            return _json({'error': 'URI not found'}, 404)
         
     @admin_required
     def update_url(self, id):
 
         """
         Update the URL associated with the given ID.
+        If the new URL is already stored under another ID, return an error message, as create_short_url does.
         Args:
             id (str): The ID of the URL to update.
         Returns:
@@ -171,17 +305,26 @@ class URLShortenerService:
 
         data = request.get_json()
         if data is None:
-            return jsonify({'error': 'Invalid JSON'}), 400
+            return _json({'error': 'Invalid JSON'}, 400)
         url = data.get('url')
         if url is not None and is_valid_url(url):
-            if id in self.url_data:
-                self.url_data[id] = {"url": url, "created_at": self.url_data[id]["created_at"]}
-                self._save_data()
-                return jsonify({'message': 'Updated'}), 200
-            else:
-                return jsonify({'error': 'Not Found'}), 404
+            with self._lock:
+                index = self.id_to_idx.get(id)
+                if index is not None:
+                    urls, url_to_idx = self.urls, self.url_to_idx
+                    existing_index = url_to_idx.get(url)
+                    if existing_index is not None and existing_index != index and urls[index] != url:
+                        existing_id = self.ids[existing_index]
+                        return _json({'error': 'URL already exists', 'short_url': _BASE_SLASH + existing_id, 'generated_uri': existing_id}, 409)
+                    self._unindex_url(urls[index], index)
+                    url_to_idx[url] = index
+                    urls[index] = url
+                    self._save_data()
+                    return _json({'message': 'Updated'}, 200)
+                else:
+                    return _json({'error': 'Not Found'}, 404)
         else:
-            return jsonify({'error': 'Invalid URL'}), 400
+            return _json({'error': 'Invalid URL'}, 400)
 
     @admin_required
     def delete_url(self, id):
@@ -194,12 +337,18 @@ class URLShortenerService:
             response: An HTTP response with a status code.
         """
 
-        if id in self.url_data:
-            del self.url_data[id]
-            self._save_data()
-            return '', 204
-        else:
-            return jsonify({'error': 'Not Found'}), 404
+        with self._lock:
+            id_to_idx, urls = self.id_to_idx, self.urls
+            index = id_to_idx.pop(id, None)
+            if index is not None:
+                self._unindex_url(urls[index], index)
+                urls[index] = None # tombstone, keeps the positions of later entries valid
+                if len(urls) > 2 * len(id_to_idx):
+                    self._compact()
+                self._save_data()
+                return '', 204
+            else:
+                return _json({'error': 'Not Found'}, 404)
 
     def get_all_keys(self):
 
@@ -209,17 +358,19 @@ class URLShortenerService:
             response (json): A JSON response containing a list of URL identifiers.
         """
 
-        if len(self.url_data.keys()) == 0:
+        with self._lock:
+            keys = list(self.id_to_idx.keys())
+        if len(keys) == 0:
             return "No URL identifiers found.", 404
         else:
-            return jsonify(list(self.url_data.keys())), 200
+            return _json(keys, 200)
 
     @admin_required
     def create_short_url(self):
 
         """
         Create a short URL for the given long URL. 
-        If the URL already exists in the url_data dictionary, return an error message.
+        If the URL already exists in the stored URLs, return an error message.
         
         Returns:
             response (json): A JSON response containing the short URL identifier, an error message if the URL already exists,
@@ -228,30 +379,30 @@ class URLShortenerService:
 
         data = request.get_json()
         if data is None:
-            return jsonify({'error': 'Invalid JSON'}), 400
+            return _json({'error': 'Invalid JSON'}, 400)
         url = data.get('url')
         if url is None or not is_valid_url(url):
-            return jsonify({'error': 'Invalid URL'}), 400
-
-        if existing_id := next(
-            (id for id, value in self.url_data.items() if value['url'] == url),
-            None,
-        ):
-            short_url = f"{BASE_URL}/{existing_id}"
-            generated_uri = existing_id
-            return jsonify({'error': 'URL already exists', 'short_url': short_url, 'generated_uri': generated_uri}), 409
-
-        try:
-            unique_id = generate_unique_id(self.url_data)
-            self.url_data[unique_id] = {"url": url, "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-            self._save_data()
-            short_url = f"{BASE_URL}/{unique_id}"
-            generated_uri = unique_id
-
-            return jsonify({'short_url': short_url, 'generated_uri': generated_uri}), 201
-        except ValueError as e:
-            error_msg = f"An internal server error occurred while generating a unique identifier: {str(e)}. Function: create_short_url(). Module: url_shortener.py"
-            return jsonify({'error': error_msg}), 500
+            return _json({'error': 'Invalid URL'}, 400)
+
+        with self._lock:
+            if (existing_index := self.url_to_idx.get(url)) is not None:
+                existing_id = self.ids[existing_index]
+                short_url = _BASE_SLASH + existing_id
+                generated_uri = existing_id
+                return _json({'error': 'URL already exists', 'short_url': short_url, 'generated_uri': generated_uri}, 409)
+
+            try:
+                unique_id = generate_unique_id(self.id_to_idx)
+                self._append(unique_id, url, time.time_ns())
+                self._save_data()
+            except ValueError as e:
+                error_msg = f"An internal server error occurred while generating a unique identifier: {str(e)}. Function: create_short_url(). Module: url_shortener.py"
+                return _json({'error': error_msg}, 500)
+
+        short_url = _BASE_SLASH + unique_id
+        generated_uri = unique_id
+
+        return _json({'short_url': short_url, 'generated_uri': generated_uri}, 201)
 
     @admin_required
     def unsupported_delete(self):
@@ -262,16 +413,19 @@ class URLShortenerService:
             response (json): A JSON response containing an error message.
         """
 
-        return jsonify({'error': 'Method not supported'}), 404
+        return _json({'error': 'Method not supported'}, 404)
 
     def run(self, *args, **kwargs):
 
         """
         Run the Flask application with the given arguments and keyword arguments.
         The host parameter is set to '0.0.0.0' to make the application accessible to any address.
+        Debug mode is only enabled when the FLASK_DEBUG environment variable is set to '1', and the reloader is disabled by default.
         Args:
             *args: Variable-length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
 
+        kwargs.setdefault('debug', os.environ.get('FLASK_DEBUG', '0') == '1')
+        kwargs.setdefault('use_reloader', False)
         self.app.run(host='0.0.0.0', *args, **kwargs)
@@ -60,7 +60,8 @@ class TestAuthHelperFunctions(unittest.TestCase):
             "user@domain.com",
             "user!",
             "abc",
-            "!"
+            "!",
+            "user_name\n"
         ]
 
         # Test valid usernames
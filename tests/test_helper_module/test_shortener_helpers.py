@@ -1,6 +1,6 @@
 import unittest
 import string
-from helper_modules.shortener_helpers import is_valid_url, generate_unique_id
+from helper_modules.shortener_helpers import is_valid_url, generate_unique_id, format_timestamp, parse_timestamp
 
 # Set the length of the unique ID to use for shortened URLs
 URI_LENGTH = 8
@@ -11,6 +11,22 @@ MAX_ATTEMPTS = 100
 # Set the max URL length
 INTERNET_MAX_PATH_LENGTH = 2048
 
+# Set the URLs to validate, paired with whether they are valid
+URL_CASES = (
+    ("https://www.example.com", True),
+    ("http://example.org", True),
+    ("https://localhost:8080", True),
+    ("http://192.168.0.1", True),
+    ("https://" + "a" * 63 + "." + "b" * 63 + ".com", True), # very long domain name
+    ("htp://www.example.com", False),
+    ("https://", False),
+    ("http://", False),
+    ("example.com", False),
+    ("https://<script>alert('XSS')</script>.example.com", False),
+    ('https://www.example.com/<path>alert("test")</error>!', False), # special characters
+    (["https://www.example.com"], False) # not a string
+)
+
 class TestURLShortenerServiceHelperFunctions(unittest.TestCase):
 
     def test_is_valid_url(self):
@@ -19,45 +35,29 @@ class TestURLShortenerServiceHelperFunctions(unittest.TestCase):
         Check if the is_valid_url method works correctly for the specified valid and invalid URLs.
         """
 
-        valid_urls = [
-            "https://www.example.com",
-            "http://example.org",
-            "https://localhost:8080",
-            "http://192.168.0.1"
-        ]
-
-        invalid_urls = [
-            "htp://www.example.com",
-            "https://",
-            "http://",
-            "example.com",
-            "https://<script>alert('XSS')</script>.example.com"
-        ]
-
-        # Test valid urls
-        for url in valid_urls:
-            self.assertTrue(is_valid_url(url))
+        for url, valid in URL_CASES:
+            with self.subTest(url=url):
+                self.assertIs(is_valid_url(url), valid)
 
-        # Test invalid urls
-        for url in invalid_urls:
-            self.assertFalse(is_valid_url(url))
+    def test_generate_unique_id_length(self):
 
-        # Test case for a very long domain name
-        long_domain = "https://" + "a" * 63 + "." + "b" * 63 + ".com"
-        self.assertTrue(is_valid_url(long_domain))
+        """
+        Check if the method generate_unique_id properly generates unique IDs with the specified length.
+        """
 
-        # Test case for special characters
-        self.assertFalse(is_valid_url('https://www.example.com/<path>alert("test")</error>!'))
+        url_data = set()
+        unique_ids = [generate_unique_id(url_data) for _ in range(100)]
+        self.assertTrue(all(len(unique_id) == URI_LENGTH for unique_id in unique_ids), "Generated IDs should have the specified length.")
 
-    def test_generate_unique_id_length(self):
+    def test_generate_unique_id_uniqueness(self):
 
         """
-        Check if the method generate_unique_id properly generates a unique ID with the specified length.
+        Check if consecutive calls of the generate_unique_id method never return the same ID.
         """
 
         url_data = set()
-        unique_id = generate_unique_id(url_data)
-        self.assertEqual(len(unique_id), URI_LENGTH, f"Generated ID should have a length of {URI_LENGTH}")
+        unique_ids = [generate_unique_id(url_data) for _ in range(100)]
+        self.assertEqual(len(set(unique_ids)), 100, "Generated IDs should be unique.")
 
     def test_generate_unique_id_characters(self):
 
@@ -67,9 +67,19 @@ class TestURLShortenerServiceHelperFunctions(unittest.TestCase):
 
         url_data = set()
         unique_id = generate_unique_id(url_data)
-        chars = string.ascii_letters + string.digits
-        for char in unique_id:
-            self.assertIn(char, chars, "Generated ID should only contain ASCII letters and digits.")
+        chars = set(string.ascii_letters + string.digits)
+        self.assertLessEqual(set(unique_id), chars, "Generated ID should only contain ASCII letters and digits.")
+
+    def test_parse_timestamp(self):
+
+        """
+        Check if the parse_timestamp method converts legacy formatted timestamps to nanoseconds and leaves integer timestamps unchanged.
+        """
+
+        timestamp = parse_timestamp("2023-03-01 10:00:00")
+        self.assertIsInstance(timestamp, int)
+        self.assertEqual(format_timestamp(timestamp), "2023-03-01 10:00:00")
+        self.assertEqual(parse_timestamp(timestamp), timestamp)
 
     def test_sorted_urls(self):
 
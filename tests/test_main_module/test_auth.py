@@ -1,13 +1,15 @@
 import unittest
-from flask import json
-from main_modules.auth import AuthService
-from flask import Flask
+from main_modules.auth import AuthService, USER_DATA
 
 class TestAuthService(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        cls.app = AuthService(None)
+        cls.client = cls.app.app.test_client()
+
     def setUp(self):
-        self.app = AuthService(Flask(__name__))
-        self.client = self.app.app.test_client()
+        USER_DATA.clear()
 
     def test_create_user(self):
 
@@ -37,7 +39,7 @@ class TestAuthService(unittest.TestCase):
         self.client.post('/users', json={'username': 'test_user', 'password': 'Str3ngP4ss1!', 'role': 'regular'})
         response = self.client.post('/users/login', json={'username': 'test_user', 'password': 'Str3ngP4ss1!'})
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('access_token', data)
 
     def test_update_password(self):
@@ -48,7 +50,7 @@ class TestAuthService(unittest.TestCase):
 
         self.client.post('/users', json={'username': 'test_user', 'password': 'Str3ngP4ss1!', 'role': 'regular'})
         login_response = self.client.post('/users/login', json={'username': 'test_user', 'password': 'Str3ngP4ss1!'})
-        access_token = json.loads(login_response.data)['access_token']
+        access_token = login_response.get_json()['access_token']
 
         response = self.client.put('/users', json={'username': 'test_user', 'old_password': 'Str3ngP4ss1!', 'new_password': 'Str3ngP4ss1!'},
                                    headers={'Authorization': f'Bearer {access_token}'})
@@ -62,7 +64,7 @@ class TestAuthService(unittest.TestCase):
 
         self.client.post('/users', json={'username': 'test_user', 'password': 'Str3ngP4ss1!', 'role': 'regular'})
         login_response = self.client.post('/users/login', json={'username': 'test_user', 'password': 'Str3ngP4ss1!'})
-        access_token = json.loads(login_response.data)['access_token']
+        access_token = login_response.get_json()['access_token']
 
         response = self.client.put('/users', json={'username': 'test_user', 'old_password': 'WrongPass1', 'new_password': 'Str3ngP4ss1!'},
                                    headers={'Authorization': f'Bearer {access_token}'})
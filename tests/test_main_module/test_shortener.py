@@ -1,44 +1,105 @@
 import unittest
-from unittest.mock import MagicMock
-from flask import json
-from main_modules.auth import AuthService
-from main_modules.shortener import URLShortenerService
+import os
+import json
+import shutil
+import tempfile
+import threading
+import itertools
+import time
+from unittest.mock import MagicMock, patch
+from main_modules.shortener import URLShortenerService, BASE_URL
+from helper_modules.shortener_helpers import generate_unique_id
+
+# Set the Authorization header sent with every request; the JWT validation is mocked
+HEADERS = {"Authorization": "Bearer test_token"}
 
 class TestURLShortenerService(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
 
         """
-        Initializes AuthService and URLShortenerService objects for test cases.
+        Initializes a stand-in for the AuthService and a URLShortenerService object once for all test cases.
+        The stand-in only provides validate_jwt, so no second Flask application is built.
+        The URLs are persisted to a private temporary directory, so test runs never share a data file.
         Initializes instance Flask test client.
         Create list of URLs to be validated.
         """
 
-        self.auth_service = AuthService(None)
-        self.auth_service.validate_jwt = MagicMock(return_value={"role": "admin"})
-        self.url_shortener_app = URLShortenerService(self.auth_service)
-        self.app = self.url_shortener_app.app.test_client()
+        cls.data_dir = tempfile.mkdtemp()
+        cls.auth_service = MagicMock()
+        cls.auth_service.validate_jwt.return_value = {"role": "admin"}
+        cls.url_shortener_app = URLShortenerService(cls.auth_service, data_file=os.path.join(cls.data_dir, "url_data.json"))
+        cls.app = cls.url_shortener_app.app.test_client()
 
-        self.urls = [
+        cls.urls = [
             "https://www.facebook.com",
             "https://www.google.com",
             "https://www.github.com",
         ]
 
+    @classmethod
+    def tearDownClass(cls):
+
+        """
+        Removes the temporary directory holding the persisted URLs.
+        """
+
+        shutil.rmtree(cls.data_dir, ignore_errors=True)
+
+    def setUp(self):
+
+        """
+        Clears the stored URLs so every test case starts from an empty store.
+        """
+
+        self.url_shortener_app._reset_data()
+
     def test_create_short_url(self):
 
         """
         Checks if method properly generates short URLs for a list of specified URLs.
         Verify if the response status code is 201 for each request.
+        Verify if each short URL starts with the base URL, checked on the raw response body without parsing the JSON.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
+        short_url_prefix = f'"short_url":"{BASE_URL.rstrip("/")}/'.encode("utf-8")
 
-        for url in self.urls:
+        with self.app as client:
+            for url in self.urls:
 
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
+                self.assertIn(short_url_prefix, response.data)
+
+    def test_create_short_url_concurrent(self):
+
+        """
+        Checks if the same URL posted from two concurrent threads, as the threaded Flask server would, is only stored once.
+        Generating the ID is slowed down, so both requests are inside create_short_url at the same time.
+        Verify if one request gets a 201 and the other a 409, and that a single entry is stored.
+        """
+
+        def slow_generate_unique_id(id_to_idx):
+            time.sleep(0.1)
+            return generate_unique_id(id_to_idx)
+
+        statuses = []
+
+        def create():
+            response = self.url_shortener_app.app.test_client().post("/", headers=HEADERS, json={"url": "https://www.example.com"})
+            statuses.append(response.status_code)
+
+        with patch("main_modules.shortener.generate_unique_id", side_effect=slow_generate_unique_id):
+            threads = [threading.Thread(target=create) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(statuses), [201, 409])
+        self.assertEqual(len(self.url_shortener_app.ids), 1)
 
     def test_redirect_url(self):
 
@@ -47,18 +108,17 @@ class TestURLShortenerService(unittest.TestCase):
         Validate if the response status code is 301 for each request.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-
-        for url in self.urls:
+        with self.app as client:
+            for url in self.urls:
 
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
 
-            response_data = json.loads(response.get_data(as_text=True))
-            generated_uri = response_data["generated_uri"]
-            response = self.app.get(f"/{generated_uri}", headers=headers)
-            self.assertEqual(response.status_code, 301)
+                response_data = response.get_json()
+                generated_uri = response_data["generated_uri"]
+                response = client.get(f"/{generated_uri}", headers=HEADERS)
+                self.assertEqual(response.status_code, 301)
 
     def test_update_url(self):
 
@@ -67,20 +127,19 @@ class TestURLShortenerService(unittest.TestCase):
         Verify if the response status code is 200 for each request.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
+        with self.app as client:
+            for url in self.urls:
 
-        for url in self.urls:
-
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
 
-            response_data = json.loads(response.get_data(as_text=True))
-            generated_uri = response_data["generated_uri"]
-            new_url = f"{url}/update"
-            data = {"url": new_url}
-            response = self.app.put(f"/{generated_uri}", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 200)
+                response_data = response.get_json()
+                generated_uri = response_data["generated_uri"]
+                new_url = f"{url}/update"
+                data = {"url": new_url}
+                response = client.put(f"/{generated_uri}", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 200)
 
     def test_delete_url(self):
 
@@ -89,18 +148,17 @@ class TestURLShortenerService(unittest.TestCase):
         Validate if the response status code is 204 for each request.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
+        with self.app as client:
+            for url in self.urls:
 
-        for url in self.urls:
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
 
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
-
-            response_data = json.loads(response.get_data(as_text=True))
-            generated_uri = response_data["generated_uri"]
-            response = self.app.delete(f"/{generated_uri}", headers=headers)
-            self.assertEqual(response.status_code, 204)
+                response_data = response.get_json()
+                generated_uri = response_data["generated_uri"]
+                response = client.delete(f"/{generated_uri}", headers=HEADERS)
+                self.assertEqual(response.status_code, 204)
 
     def test_get_all_keys(self):
 
@@ -109,17 +167,16 @@ class TestURLShortenerService(unittest.TestCase):
         Validate if the response status code is 200.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-
-        # First, we create short URLs
-        for url in self.urls:
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
+        with self.app as client:
+            # First, we create short URLs
+            for url in self.urls:
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
 
-        # Test get_all_keys
-        response = self.app.get("/keys", headers=headers)
-        self.assertEqual(response.status_code, 200)
+            # Test get_all_keys
+            response = client.get("/keys", headers=HEADERS)
+            self.assertEqual(response.status_code, 200)
 
     def test_search_uri(self):
 
@@ -128,18 +185,70 @@ class TestURLShortenerService(unittest.TestCase):
         Validate if the response status code is 200 for each request.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
+        with self.app as client:
+            for url in self.urls:
 
-        for url in self.urls:
+                data = {"url": url}
+                response = client.post("/", headers=HEADERS, json=data)
+                self.assertEqual(response.status_code, 201)
 
-            data = {"url": url}
-            response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
-            self.assertEqual(response.status_code, 201)
+                response_data = response.get_json()
+                generated_uri = response_data["generated_uri"]
+                response = client.get(f"/search/{generated_uri}", headers=HEADERS)
+                self.assertEqual(response.status_code, 200)
 
-            response_data = json.loads(response.get_data(as_text=True))
-            generated_uri = response_data["generated_uri"]
-            response = self.app.get(f"/search/{generated_uri}", headers=headers)
-            self.assertEqual(response.status_code, 200)
+    def test_load_legacy_timestamps(self):
+
+        """
+        Tests if a data file written with formatted string timestamps is still loaded and served.
+        Validate if the response status code is 200 and the timestamp is preserved.
+        """
+
+        data_file = os.path.join(self.data_dir, "legacy_url_data.json")
+        with open(data_file, "w") as file:
+            json.dump({"abcdEFGH": {"url": "https://www.example.com", "created_at": "2023-03-01 10:00:00"}}, file)
+
+        legacy_app = URLShortenerService(self.auth_service, data_file=data_file).app.test_client()
+
+        response = legacy_app.get("/search/abcdEFGH", headers=HEADERS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["timestamp"], "2023-03-01 10:00:00")
+
+        response = legacy_app.get("/", headers=HEADERS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]["created_at"], "2023-03-01 10:00:00")
+
+    def test_load_duplicate_urls(self):
+
+        """
+        Tests if a data file holding the same URL under two IDs, as older updates could write, keeps that URL registered.
+        Validate if the URL is only accepted again once neither ID holds it anymore, whichever ID is changed first.
+        """
+
+        data_file = os.path.join(self.data_dir, "duplicate_url_data.json")
+        duplicate = {"url": "https://www.example.com", "created_at": 1677664800000000000}
+
+        for (first, second), delete in itertools.product((("AAAAAAAA", "BBBBBBBB"), ("BBBBBBBB", "AAAAAAAA")), (True, False)):
+            with self.subTest(first=first, delete=delete):
+                with open(data_file, "w") as file:
+                    json.dump({"AAAAAAAA": duplicate, "BBBBBBBB": duplicate}, file)
+
+                duplicate_app = URLShortenerService(self.auth_service, data_file=data_file).app.test_client()
+
+                if delete:
+                    response = duplicate_app.delete(f"/{first}", headers=HEADERS)
+                    self.assertEqual(response.status_code, 204)
+                else:
+                    response = duplicate_app.put(f"/{first}", headers=HEADERS, json={"url": "https://www.example.net"})
+                    self.assertEqual(response.status_code, 200)
+                response = duplicate_app.post("/", headers=HEADERS, json={"url": "https://www.example.com"})
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.get_json()["generated_uri"], second)
+
+                response = duplicate_app.put(f"/{second}", headers=HEADERS, json={"url": "https://www.example.org"})
+                self.assertEqual(response.status_code, 200)
+                response = duplicate_app.post("/", headers=HEADERS, json={"url": "https://www.example.com"})
+                self.assertEqual(response.status_code, 201)
 
     def test_create_short_url_invalid_url(self):
 
@@ -148,9 +257,8 @@ class TestURLShortenerService(unittest.TestCase):
         Check if the response status code is 400.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
         data = {"url": "invalid_url"}
-        response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
+        response = self.app.post("/", headers=HEADERS, json=data)
         self.assertEqual(response.status_code, 400)
 
     def test_redirect_url_not_found(self):
@@ -160,9 +268,34 @@ class TestURLShortenerService(unittest.TestCase):
         Check if the response status code is 404.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-        response = self.app.get("/nonexistent", headers=headers)
+        response = self.app.get("/abcdEFGH", headers=HEADERS)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {"error": "URL not found"})
+
+    def test_redirect_url_malformed_id(self):
+
+        """
+        Testing the functionality when trying to redirect a short URL that is not a well-formed ID.
+        Check if the response status code is 404 and the error is still returned as JSON.
+        """
+
+        response = self.app.get("/nonexistent", headers=HEADERS)
         self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {"error": "Not Found"})
+
+    def test_keys_method_not_allowed(self):
+
+        """
+        Testing the functionality when trying to update or delete the /keys endpoint, which only supports GET.
+        Check if the response status code is 405 and the error is returned as JSON.
+        """
+
+        for method in ("put", "delete"):
+            with self.subTest(method=method):
+                response = getattr(self.app, method)("/keys", headers=HEADERS)
+                self.assertEqual(response.status_code, 405)
+                self.assertEqual(response.get_json(), {"error": "Method not allowed"})
+                self.assertIn("GET", response.headers["Allow"])
 
     def test_update_url_invalid_url(self):
 
@@ -171,17 +304,39 @@ class TestURLShortenerService(unittest.TestCase):
         Check if the response status code is 400.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
         data = {"url": "https://www.example.com"}
-        response = self.app.post("/", headers=headers, data=json.dumps(data), content_type="application/json")
+        response = self.app.post("/", headers=HEADERS, json=data)
         self.assertEqual(response.status_code, 201)
 
-        response_data = json.loads(response.get_data(as_text=True))
+        response_data = response.get_json()
         generated_uri = response_data["generated_uri"]
         data = {"url": "invalid_url"}
-        response = self.app.put(f"/{generated_uri}", headers=headers, data=json.dumps(data), content_type="application/json")
+        response = self.app.put(f"/{generated_uri}", headers=HEADERS, json=data)
         self.assertEqual(response.status_code, 400)
 
+    def test_update_url_existing_url(self):
+
+        """
+        Test the functionality when trying to update a short URL to a URL that is already stored under another short URL.
+        Check if the response status code is 409 and that the other short URL stays registered for its URL.
+        """
+
+        with self.app as client:
+            response = client.post("/", headers=HEADERS, json={"url": "https://www.example.com"})
+            self.assertEqual(response.status_code, 201)
+            response = client.post("/", headers=HEADERS, json={"url": "https://www.example.org"})
+            self.assertEqual(response.status_code, 201)
+            generated_uri = response.get_json()["generated_uri"]
+
+            response = client.put(f"/{generated_uri}", headers=HEADERS, json={"url": "https://www.example.com"})
+            self.assertEqual(response.status_code, 409)
+
+            response = client.delete(f"/{generated_uri}", headers=HEADERS)
+            self.assertEqual(response.status_code, 204)
+
+            response = client.post("/", headers=HEADERS, json={"url": "https://www.example.com"})
+            self.assertEqual(response.status_code, 409)
+
     def test_delete_url_not_found(self):
 
         """
@@ -189,9 +344,9 @@ class TestURLShortenerService(unittest.TestCase):
         Check if the response status code is 404.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-        response = self.app.delete("/nonexistent", headers=headers)
+        response = self.app.delete("/abcdEFGH", headers=HEADERS)
         self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {"error": "Not Found"})
 
     def test_unsupported_delete(self):
 
@@ -200,8 +355,7 @@ class TestURLShortenerService(unittest.TestCase):
         Check if the response status code is 404.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-        response = self.app.delete("/", headers=headers)
+        response = self.app.delete("/", headers=HEADERS)
         self.assertEqual(response.status_code, 404)
 
     def test_serve_index(self):
@@ -209,11 +363,26 @@ class TestURLShortenerService(unittest.TestCase):
         """
         Testing the functionality serving of the application's index page.
         Check if the response status code is 200.
+        Check if the URLs are listed from newest to oldest, reading the JSON response directly.
         """
 
-        headers = {"Authorization": "Bearer test_token"}
-        response = self.app.get("/", headers=headers)
+        response = self.app.get("/", headers=HEADERS)
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+        with self.app as client:
+            for url in self.urls:
+                response = client.post("/", headers=HEADERS, json={"url": url})
+                self.assertEqual(response.status_code, 201)
+
+            response = client.get("/", headers=HEADERS)
+            self.assertEqual(response.status_code, 200)
+
+        short_urls = response.get_json()
+        self.assertEqual([short_url["original_url"] for short_url in short_urls], self.urls[::-1])
+
+        created_at_list = [short_url["created_at"] for short_url in short_urls]
+        self.assertTrue(all(a >= b for a, b in zip(created_at_list, created_at_list[1:])), "URLs should be sorted from newest to oldest.")
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file